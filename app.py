@@ -1,5 +1,5 @@
-from flask import Flask
-from flask_jwt_extended import JWTManager
+from flask import Flask, jsonify
+from flask_jwt_extended import JWTManager, verify_jwt_in_request, get_jwt_identity
 from dotenv import load_dotenv
 import os
 from prisma import Prisma
@@ -23,6 +23,7 @@ from routes.forms import forms_bp
 from routes.questions import questions_bp
 from routes.responses import responses_bp
 from routes.analytics import analytics_bp
+from services.usage import over_request_limit
 
 # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
@@ -35,6 +36,19 @@ app.register_blueprint(analytics_bp, url_prefix='/api/v1/analytics')
 async def before_request():
     await prisma.connect()
 
+    # Count authenticated requests against the caller's per-minute quota;
+    # invalid tokens are left for @jwt_required to reject
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        user_id = None
+    if user_id is not None and over_request_limit(user_id):
+        return jsonify({
+            'error': 'Too Many Requests',
+            'message': 'Request rate limit exceeded'
+        }), 429
+
 @app.teardown_appcontext
 async def teardown_appcontext(exception):
     await prisma.disconnect()
@@ -0,0 +1,152 @@
+"""Compare peak RSS of the export row path before and after services/rows.py.
+
+Builds a SQLite database with the Response/Answer indexes from
+prisma/schema.prisma and --forms forms, each holding --responses x
+--questions answers (1M per form by default) with their responses
+interleaved, then exports form 1 in each mode in a fresh process:
+
+  models  loads every response with its answers as objects and builds one
+          dict per row, as export_form_responses did with Prisma includes
+  rows    streams column tuples page by page through services.rows
+
+Plain Python objects stand in for Prisma's pydantic models, so the models
+figure understates the real cost.
+
+Usage:
+    python benchmarks/export_memory.py [--responses 100000] [--questions 10] [--forms 3]
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TABLES = [
+    'CREATE TABLE "Response" ("id" INTEGER PRIMARY KEY, "formId" INTEGER NOT NULL, '
+    '"respondentEmail" TEXT, "submittedAt" INTEGER NOT NULL)',
+    'CREATE TABLE "Answer" ("id" INTEGER PRIMARY KEY, "responseId" INTEGER NOT NULL, '
+    '"questionId" INTEGER NOT NULL, "textAnswer" TEXT NOT NULL)',
+    'CREATE INDEX "Response_formId_submittedAt_idx" ON "Response" ("formId", "submittedAt")',
+    'CREATE INDEX "Response_formId_id_idx" ON "Response" ("formId", "id")',
+    'CREATE INDEX "Answer_responseId_idx" ON "Answer" ("responseId")',
+    'CREATE INDEX "Answer_questionId_idx" ON "Answer" ("questionId")',
+]
+
+
+class Model:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class RawDb:
+    """Minimal stand-in for Prisma's query_raw over a sqlite3 connection."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+
+    async def query_raw(self, query, *params):
+        cursor = self.conn.execute(query, params)
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+
+def build(path, responses, questions, forms):
+    conn = sqlite3.connect(path)
+    for statement in TABLES:
+        conn.execute(statement)
+    now = int(time.time() * 1000)
+    total = responses * forms
+    # Responses of different forms alternate, as they do when forms collect at once
+    conn.executemany(
+        'INSERT INTO "Response" VALUES (?, ?, ?, ?)',
+        ((r, r % forms + 1, f'user{r}@example.com', now - r * 1000) for r in range(1, total + 1))
+    )
+    conn.executemany(
+        'INSERT INTO "Answer" ("responseId", "questionId", "textAnswer") VALUES (?, ?, ?)',
+        ((r, (r % forms) * questions + q, f'answer {r} to question {q}')
+         for r in range(1, total + 1) for q in range(1, questions + 1))
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_models(path, questions):
+    conn = sqlite3.connect(path)
+    responses = {
+        row[0]: Model(id=row[0], respondentEmail=row[1], submittedAt=row[2], answers=[])
+        for row in conn.execute('SELECT "id", "respondentEmail", "submittedAt" FROM "Response" WHERE "formId" = 1')
+    }
+    for row in conn.execute(
+        'SELECT a."id", a."responseId", a."questionId", a."textAnswer" FROM "Answer" a '
+        'JOIN "Response" r ON r."id" = a."responseId" WHERE r."formId" = 1'
+    ):
+        responses[row[1]].answers.append(
+            Model(id=row[0], responseId=row[1], questionId=row[2], textAnswer=row[3])
+        )
+
+    data = []
+    for response in responses.values():
+        row = {'Response ID': response.id, 'Respondent Email': response.respondentEmail, 'Submitted At': response.submittedAt}
+        answer_dict = {a.questionId: a.textAnswer for a in response.answers}
+        for q in range(1, questions + 1):
+            row[f'Question {q}'] = answer_dict.get(q, '')
+        data.append(row)
+    return len(data)
+
+
+async def run_rows(path, questions):
+    from services.rows import iter_responses
+
+    count = 0
+    async for response_id, email, submitted_at, answer_dict in iter_responses(RawDb(path), 1):
+        # Rows are handed straight to the sheet in the export, so none are kept
+        row = [response_id, email, submitted_at.isoformat()] + [answer_dict.get(q, '') for q in range(1, questions + 1)]
+        count += 1
+    return count
+
+
+def measure(mode, path, questions):
+    result = subprocess.run(
+        [sys.executable, __file__, '--child', mode, '--db', path, '--questions', str(questions)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    return result.stdout.strip()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--responses', type=int, default=100000)
+    parser.add_argument('--questions', type=int, default=10)
+    parser.add_argument('--forms', type=int, default=3)
+    parser.add_argument('--child', choices=('models', 'rows'), help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        started = time.perf_counter()
+        if args.child == 'models':
+            count = run_models(args.db, args.questions)
+        else:
+            count = asyncio.run(run_rows(args.db, args.questions))
+        elapsed = time.perf_counter() - started
+        # ru_maxrss is in kilobytes on Linux
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f'{count} rows in {elapsed:.1f}s, peak RSS {peak_mb:.0f} MB')
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.db')
+        build(path, args.responses, args.questions, args.forms)
+        print(f'{args.forms} forms, exporting form 1: {args.responses} responses x {args.questions} questions'
+              f' = {args.responses * args.questions} answers')
+        for mode in ('models', 'rows'):
+            print(f'{mode:<8} {measure(mode, path, args.questions)}')
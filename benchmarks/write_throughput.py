@@ -0,0 +1,151 @@
+"""Compare response-submission write throughput across storage configurations.
+
+Each writer thread inserts a Response with its Answers in one transaction,
+which is the write pattern of submit_response. SQLite is measured with its
+default rollback journal and with the journal_mode=WAL set by
+python -m services.db, keeping the default synchronous=FULL that Prisma
+connections use. Writers wait --busy-timeout seconds for the lock, like the
+socket_timeout parameter on DATABASE_URL. PostgreSQL is included when
+--postgres-url is given and psycopg is installed.
+
+Usage:
+    python benchmarks/write_throughput.py [--writers 8] [--submissions 500] [--answers 10]
+        [--busy-timeout 5] [--postgres-url postgresql://localhost/forms_bench]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+SQLITE_CONFIGS = {
+    'sqlite default (journal=DELETE, synchronous=FULL)': [],
+    'sqlite WAL (synchronous=FULL)': [
+        'PRAGMA journal_mode = WAL',
+    ],
+}
+
+TABLES = [
+    'CREATE TABLE "Response" ("id" INTEGER PRIMARY KEY, "formId" INTEGER NOT NULL, '
+    '"respondentEmail" TEXT, "submittedAt" INTEGER NOT NULL)',
+    'CREATE INDEX "Response_formId_submittedAt_idx" ON "Response" ("formId", "submittedAt")',
+    'CREATE INDEX "Response_formId_id_idx" ON "Response" ("formId", "id")',
+    'CREATE TABLE "Answer" ("id" INTEGER PRIMARY KEY, "responseId" INTEGER NOT NULL, '
+    '"questionId" INTEGER NOT NULL, "textAnswer" TEXT NOT NULL)',
+    'CREATE INDEX "Answer_responseId_idx" ON "Answer" ("responseId")',
+    'CREATE INDEX "Answer_questionId_idx" ON "Answer" ("questionId")',
+]
+
+PG_TABLES = [
+    'DROP TABLE IF EXISTS "BenchAnswer", "BenchResponse"',
+    'CREATE TABLE "BenchResponse" ("id" SERIAL PRIMARY KEY, "formId" INTEGER NOT NULL, '
+    '"respondentEmail" TEXT, "submittedAt" TIMESTAMP(3) NOT NULL)',
+    'CREATE INDEX ON "BenchResponse" ("formId", "submittedAt")',
+    'CREATE INDEX ON "BenchResponse" ("formId", "id")',
+    'CREATE TABLE "BenchAnswer" ("id" SERIAL PRIMARY KEY, "responseId" INTEGER NOT NULL, '
+    '"questionId" INTEGER NOT NULL, "textAnswer" TEXT NOT NULL)',
+    'CREATE INDEX ON "BenchAnswer" ("responseId")',
+    'CREATE INDEX ON "BenchAnswer" ("questionId")',
+]
+
+
+def run_writers(writers, submissions, submit):
+    errors = []
+
+    def worker(index):
+        try:
+            for n in range(submissions):
+                submit(index, n)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if errors:
+        raise errors[0]
+    return writers * submissions / elapsed
+
+
+def bench_sqlite(pragmas, writers, submissions, answers, busy_timeout):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        setup = sqlite3.connect(path)
+        for statement in pragmas + TABLES:
+            setup.execute(statement)
+        setup.commit()
+        setup.close()
+
+        local = threading.local()
+
+        def submit(index, n):
+            if not hasattr(local, 'conn'):
+                local.conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None)
+            conn = local.conn
+            conn.execute('BEGIN IMMEDIATE')
+            cursor = conn.execute(
+                'INSERT INTO "Response" ("formId", "respondentEmail", "submittedAt") VALUES (?, ?, ?)',
+                (1, f'user{index}-{n}@example.com', int(time.time() * 1000))
+            )
+            conn.executemany(
+                'INSERT INTO "Answer" ("responseId", "questionId", "textAnswer") VALUES (?, ?, ?)',
+                [(cursor.lastrowid, q, f'answer {n} to question {q}') for q in range(1, answers + 1)]
+            )
+            conn.execute('COMMIT')
+
+        return run_writers(writers, submissions, submit)
+
+
+def bench_postgres(url, writers, submissions, answers):
+    import psycopg
+
+    with psycopg.connect(url, autocommit=True) as setup:
+        for statement in PG_TABLES:
+            setup.execute(statement)
+
+    local = threading.local()
+
+    def submit(index, n):
+        if not hasattr(local, 'conn'):
+            local.conn = psycopg.connect(url)
+        with local.conn.transaction():
+            response_id = local.conn.execute(
+                'INSERT INTO "BenchResponse" ("formId", "respondentEmail", "submittedAt") '
+                'VALUES (%s, %s, now()) RETURNING "id"',
+                (1, f'user{index}-{n}@example.com')
+            ).fetchone()[0]
+            local.conn.cursor().executemany(
+                'INSERT INTO "BenchAnswer" ("responseId", "questionId", "textAnswer") VALUES (%s, %s, %s)',
+                [(response_id, q, f'answer {n} to question {q}') for q in range(1, answers + 1)]
+            )
+
+    try:
+        return run_writers(writers, submissions, submit)
+    finally:
+        with psycopg.connect(url, autocommit=True) as cleanup:
+            cleanup.execute(PG_TABLES[0])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--submissions', type=int, default=500, help='submissions per writer')
+    parser.add_argument('--answers', type=int, default=10, help='answers per submission')
+    parser.add_argument('--busy-timeout', type=float, default=5, help='seconds a writer waits for the lock')
+    parser.add_argument('--postgres-url')
+    args = parser.parse_args()
+
+    print(f'{args.writers} writers x {args.submissions} submissions x {args.answers} answers')
+    for name, pragmas in SQLITE_CONFIGS.items():
+        rate = bench_sqlite(pragmas, args.writers, args.submissions, args.answers, args.busy_timeout)
+        print(f'{name:<55} {rate:>10.0f} submissions/s')
+
+    if args.postgres_url:
+        rate = bench_postgres(args.postgres_url, args.writers, args.submissions, args.answers)
+        print(f'{"postgresql":<55} {rate:>10.0f} submissions/s')
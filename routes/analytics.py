@@ -3,7 +3,10 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import prisma
 from collections import Counter
 from datetime import datetime, timedelta
-import pandas as pd
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from services.timeseries import GRANULARITIES, next_bucket_start, response_timeseries
+from services.archive import iter_archived_rows
+from services.rows import iter_submitted_at, iter_responses, count_answers
 import io
 
 analytics_bp = Blueprint('analytics', __name__)
@@ -18,10 +21,11 @@ async def get_form_summary(form_id):
         form = await prisma.form.find_first(
             where={
                 'id': form_id,
-                'userId': user_id
+                'userId': user_id,
+                'deletedAt': None
             },
             include={
-                'responses': True
+                'archivedDays': True
             }
         )
 
@@ -31,7 +35,18 @@ async def get_form_summary(form_id):
                 'message': 'Form not found'
             }), 404
 
-        if not form.responses:
+        # Stream submission times of live responses and add archived rollups
+        date_counts = Counter()
+        first_response_at = min((d.firstAt for d in form.archivedDays), default=None)
+        latest_response_at = max((d.lastAt for d in form.archivedDays), default=None)
+        async for submitted_at in iter_submitted_at(prisma, form_id):
+            date_counts[submitted_at.date().isoformat()] += 1
+            if first_response_at is None or submitted_at < first_response_at:
+                first_response_at = submitted_at
+            if latest_response_at is None or submitted_at > latest_response_at:
+                latest_response_at = submitted_at
+
+        if first_response_at is None:
             return jsonify({
                 'total_responses': 0,
                 'response_rate_per_day': [],
@@ -39,26 +54,82 @@ async def get_form_summary(form_id):
                 'latest_response_at': None
             }), 200
 
-        # Calculate response statistics
-        responses = sorted(form.responses, key=lambda x: x.submittedAt)
-        first_response = responses[0]
-        latest_response = responses[-1]
-
         # Calculate response rate per day
-        date_counts = Counter(r.submittedAt.date() for r in responses)
+        for archived_day in form.archivedDays:
+            date_counts[archived_day.day] += archived_day.count
         response_rate = [
             {
-                'date': date.isoformat(),
+                'date': date,
                 'count': count
             }
             for date, count in sorted(date_counts.items())
         ]
 
         return jsonify({
-            'total_responses': len(responses),
+            'total_responses': sum(date_counts.values()),
             'response_rate_per_day': response_rate,
-            'first_response_at': first_response.submittedAt.isoformat(),
-            'latest_response_at': latest_response.submittedAt.isoformat()
+            'first_response_at': first_response_at.isoformat(),
+            'latest_response_at': latest_response_at.isoformat()
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@analytics_bp.route('/forms/<int:form_id>/analytics/timeseries', methods=['GET'])
+@jwt_required()
+async def get_form_timeseries(form_id):
+    try:
+        user_id = get_jwt_identity()
+        granularity = request.args.get('granularity', 'day')
+        tz_name = request.args.get('tz', 'UTC')
+
+        try:
+            zone = ZoneInfo(tz_name)
+            end = datetime.fromisoformat(request.args['end']) if 'end' in request.args else next_bucket_start(datetime.now(zone), granularity)
+            start = datetime.fromisoformat(request.args['start']) if 'start' in request.args else end - timedelta(days=30)
+        except (ValueError, ZoneInfoNotFoundError) as e:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': str(e)
+            }), 400
+
+        # Dates without an offset are read in the requested timezone
+        start = start if start.tzinfo else start.replace(tzinfo=zone)
+        end = end if end.tzinfo else end.replace(tzinfo=zone)
+
+        if granularity not in GRANULARITIES or start >= end:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'granularity must be one of {", ".join(GRANULARITIES)} and start must be before end'
+            }), 400
+
+        # Verify form ownership
+        form = await prisma.form.find_first(
+            where={
+                'id': form_id,
+                'userId': user_id,
+                'deletedAt': None
+            }
+        )
+
+        if not form:
+            return jsonify({
+                'error': 'Not Found',
+                'message': 'Form not found'
+            }), 404
+
+        buckets = await response_timeseries(prisma, form_id, start, end, granularity, tz_name)
+
+        return jsonify({
+            'granularity': granularity,
+            'timezone': tz_name,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'total_responses': sum(b['count'] for b in buckets),
+            'buckets': buckets
         }), 200
 
     except Exception as e:
@@ -77,35 +148,28 @@ async def get_question_analytics(question_id):
         question = await prisma.question.find_unique(
             where={'id': question_id},
             include={
-                'form': True,
-                'answers': True
+                'form': True
             }
         )
 
-        if not question or question.form.userId != user_id:
+        if not question or question.deletedAt or question.form.deletedAt or question.form.userId != user_id:
             return jsonify({
                 'error': 'Not Found',
                 'message': 'Question not found'
             }), 404
 
-        if not question.answers:
-            return jsonify({
-                'total_answers': 0,
-                'common_answers': []
-            }), 200
-
-        # Calculate answer statistics
-        answer_counts = Counter(a.textAnswer for a in question.answers)
+        # Calculate answer statistics in SQL
+        answer_counts = await count_answers(prisma, question_id)
         common_answers = [
             {
                 'text_answer': answer,
                 'count': count
             }
-            for answer, count in answer_counts.most_common()
+            for answer, count in answer_counts
         ]
 
         return jsonify({
-            'total_answers': len(question.answers),
+            'total_answers': sum(count for _, count in answer_counts),
             'common_answers': common_answers
         }), 200
 
@@ -125,14 +189,12 @@ async def export_form_responses(form_id):
         form = await prisma.form.find_first(
             where={
                 'id': form_id,
-                'userId': user_id
+                'userId': user_id,
+                'deletedAt': None
             },
             include={
-                'questions': True,
-                'responses': {
-                    'include': {
-                        'answers': True
-                    }
+                'questions': {
+                    'where': {'deletedAt': None}
                 }
             }
         )
@@ -143,26 +205,27 @@ async def export_form_responses(form_id):
                 'message': 'Form not found'
             }), 404
 
-        # Prepare data for export
-        data = []
-        for response in form.responses:
-            row = {
-                'Response ID': response.id,
-                'Respondent Email': response.respondentEmail,
-                'Submitted At': response.submittedAt.isoformat()
-            }
-            
-            # Add answers to the row
-            answer_dict = {a.questionId: a.textAnswer for a in response.answers}
-            for question in form.questions:
-                row[question.questionText] = answer_dict.get(question.id, '')
-            
-            data.append(row)
-
-        # Create DataFrame and export to Excel
-        df = pd.DataFrame(data)
+        # openpyxl is only needed here, so import it on first export instead
+        # of on every worker boot
+        from openpyxl import Workbook
+
+        # Write-only mode streams rows to the sheet instead of keeping them all
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(['Response ID', 'Respondent Email', 'Submitted At'] + [q.questionText for q in form.questions])
+
+        # Archived responses first as they are older
+        for row in iter_archived_rows(form_id, form.questions):
+            sheet.append(row)
+
+        async for response_id, respondent_email, submitted_at, answer_dict in iter_responses(prisma, form_id):
+            sheet.append(
+                [response_id, respondent_email, submitted_at.isoformat()]
+                + [answer_dict.get(q.id, '') for q in form.questions]
+            )
+
         output = io.BytesIO()
-        df.to_excel(output, index=False, engine='openpyxl')
+        workbook.save(output)
         output.seek(0)
 
         return send_file(
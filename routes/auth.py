@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import prisma
+from services.usage import QUOTAS, QUOTA_REQUESTS_PER_MINUTE, get_usage, request_counter
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -89,4 +90,32 @@ async def logout():
         return jsonify({
             'error': 'Internal Server Error',
             'message': str(e)
-        }), 500 
\ No newline at end of file
+        }), 500 
+
+@auth_bp.route('/usage', methods=['GET'])
+@jwt_required()
+async def get_user_usage():
+    try:
+        user_id = get_jwt_identity()
+        usage = await get_usage(prisma, user_id)
+
+        return jsonify({
+            'usage': {
+                'forms': usage.forms,
+                'questions': usage.questions,
+                'responses': usage.responses,
+                'answer_bytes': usage.answerBytes,
+                'requests_this_minute': request_counter.current(user_id)
+            },
+            # 0 means unlimited
+            'quotas': {
+                **QUOTAS,
+                'requests_per_minute': QUOTA_REQUESTS_PER_MINUTE
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
\ No newline at end of file
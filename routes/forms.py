@@ -1,6 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, make_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import prisma
+from services.purge import start_purge, get_progress
+from services.versions import publish_version, get_published_version, version_cache
+from services.validation import question_data, question_settings
+from services.usage import QuotaExceeded, check_quota, record_usage
 from datetime import datetime
 
 forms_bp = Blueprint('forms', __name__)
@@ -12,6 +16,7 @@ async def create_form():
         user_id = get_jwt_identity()
         data = request.get_json()
 
+        await check_quota(prisma, user_id, forms=1)
         form = await prisma.form.create(
             data={
                 'title': data['title'],
@@ -19,6 +24,7 @@ async def create_form():
                 'userId': user_id
             }
         )
+        await record_usage(prisma, user_id, forms=1)
 
         return jsonify({
             'form_id': form.id,
@@ -28,6 +34,106 @@ async def create_form():
             'is_published': form.isPublished
         }), 201
 
+    except QuotaExceeded as e:
+        return jsonify({
+            'error': 'Forbidden',
+            'message': str(e)
+        }), 403
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+
+@forms_bp.route('/import', methods=['POST'])
+@jwt_required()
+async def import_form():
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+
+        # Clone an existing form or import questions from the request body
+        if 'source_form_id' in data:
+            source = await prisma.form.find_first(
+                where={
+                    'id': data['source_form_id'],
+                    'userId': user_id,
+                    'deletedAt': None
+                },
+                include={
+                    'questions': {
+                        'where': {'deletedAt': None},
+                        'orderBy': {'displayOrder': 'asc'}
+                    }
+                }
+            )
+
+            if not source:
+                return jsonify({
+                    'error': 'Not Found',
+                    'message': 'Source form not found'
+                }), 404
+
+            title = data.get('title', f'Copy of {source.title}')
+            description = data.get('description', source.description)
+            questions = [{
+                'question_text': q.questionText,
+                'is_required': q.isRequired,
+                **question_settings(q)
+            } for q in source.questions]
+        else:
+            title = data['title']
+            description = data.get('description')
+            questions = data.get('questions', [])
+
+        await check_quota(prisma, user_id, forms=1, questions=len(questions))
+
+        # Nested create writes the form and all its questions in one
+        # transaction, with display order taken from list position
+        form = await prisma.form.create(
+            data={
+                'title': title,
+                'description': description,
+                'userId': user_id,
+                'questions': {
+                    'create': [{
+                        'questionText': q['question_text'],
+                        'isRequired': q.get('is_required', False),
+                        'displayOrder': position,
+                        **question_data(q)
+                    } for position, q in enumerate(questions, start=1)]
+                }
+            },
+            include={
+                'questions': {
+                    'orderBy': {'displayOrder': 'asc'}
+                }
+            }
+        )
+        await record_usage(prisma, user_id, forms=1, questions=len(form.questions))
+
+        return jsonify({
+            'form_id': form.id,
+            'title': form.title,
+            'description': form.description,
+            'created_at': form.createdAt.isoformat(),
+            'is_published': form.isPublished,
+            'questions': [{
+                'question_id': q.id,
+                'question_text': q.questionText,
+                'is_required': q.isRequired,
+                'display_order': q.displayOrder,
+                **question_settings(q)
+            } for q in form.questions]
+        }), 201
+
+    except QuotaExceeded as e:
+        return jsonify({
+            'error': 'Forbidden',
+            'message': str(e)
+        }), 403
+
     except Exception as e:
         return jsonify({
             'error': 'Bad Request',
@@ -40,7 +146,10 @@ async def get_all_forms():
     try:
         user_id = get_jwt_identity()
         forms = await prisma.form.find_many(
-            where={'userId': user_id},
+            where={
+                'userId': user_id,
+                'deletedAt': None
+            },
             include={
                 'responses': True
             }
@@ -70,10 +179,13 @@ async def get_form(form_id):
         form = await prisma.form.find_first(
             where={
                 'id': form_id,
-                'userId': user_id
+                'userId': user_id,
+                'deletedAt': None
             },
             include={
-                'questions': True
+                'questions': {
+                    'where': {'deletedAt': None}
+                }
             }
         )
 
@@ -93,7 +205,8 @@ async def get_form(form_id):
                 'question_id': q.id,
                 'question_text': q.questionText,
                 'is_required': q.isRequired,
-                'display_order': q.displayOrder
+                'display_order': q.displayOrder,
+                **question_settings(q)
             } for q in form.questions]
         }), 200
 
@@ -103,6 +216,36 @@ async def get_form(form_id):
             'message': str(e)
         }), 500
 
+@forms_bp.route('/<int:form_id>/published', methods=['GET'])
+async def get_published_form(form_id):
+    try:
+        version = await get_published_version(prisma, form_id)
+
+        if not version:
+            return jsonify({
+                'error': 'Not Found',
+                'message': 'Form not found or not published'
+            }), 404
+
+        # Versions never change, so the version id is a strong validator
+        etag = f'"{form_id}-{version["version_id"]}"'
+        if request.headers.get('If-None-Match') == etag:
+            return '', 304
+
+        response = make_response(jsonify({
+            **version['form'],
+            'version_id': version['version_id'],
+            'version': version['version']
+        }), 200)
+        response.headers['ETag'] = etag
+        return response
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
 @forms_bp.route('/<int:form_id>', methods=['PUT'])
 @jwt_required()
 async def update_form(form_id):
@@ -113,7 +256,8 @@ async def update_form(form_id):
         form = await prisma.form.find_first(
             where={
                 'id': form_id,
-                'userId': user_id
+                'userId': user_id,
+                'deletedAt': None
             }
         )
 
@@ -152,7 +296,8 @@ async def delete_form(form_id):
         form = await prisma.form.find_first(
             where={
                 'id': form_id,
-                'userId': user_id
+                'userId': user_id,
+                'deletedAt': None
             }
         )
 
@@ -162,12 +307,101 @@ async def delete_form(form_id):
                 'message': 'Form not found'
             }), 404
 
-        await prisma.form.delete(
-            where={'id': form_id}
+        live_questions = await prisma.question.count(
+            where={'formId': form_id, 'deletedAt': None}
+        )
+
+        # Hide the form now; responses and answers are purged in bounded chunks
+        await prisma.form.update(
+            where={'id': form_id},
+            data={
+                'deletedAt': datetime.utcnow(),
+                'isPublished': False
+            }
         )
+        version_cache.invalidate(form_id)
+        await record_usage(prisma, user_id, forms=-1, questions=-live_questions)
+        start_purge('form', form_id, user_id)
+
+        return jsonify({
+            'message': 'Form deleted successfully',
+            'purge_status': 'running'
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@forms_bp.route('/<int:form_id>/purge', methods=['GET'])
+@jwt_required()
+async def get_form_purge_status(form_id):
+    try:
+        user_id = get_jwt_identity()
+        progress = get_progress('form', form_id)
+
+        if not progress or progress['user_id'] != user_id:
+            return jsonify({
+                'error': 'Not Found',
+                'message': 'No purge found for form'
+            }), 404
 
         return jsonify({
-            'message': 'Form deleted successfully'
+            'form_id': form_id,
+            'status': progress['status'],
+            'answers_deleted': progress['answers_deleted'],
+            'responses_deleted': progress['responses_deleted'],
+            'started_at': progress['started_at'],
+            'finished_at': progress['finished_at'],
+            'error': progress['error']
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@forms_bp.route('/<int:form_id>/retention', methods=['PUT'])
+@jwt_required()
+async def set_form_retention(form_id):
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        retention_days = data.get('retention_days')
+
+        # bool is a subclass of int, so true/false must be rejected explicitly
+        if retention_days is not None and (
+            isinstance(retention_days, bool) or not isinstance(retention_days, int) or retention_days < 1
+        ):
+            return jsonify({
+                'error': 'Bad Request',
+                'message': 'retention_days must be a positive integer or null'
+            }), 400
+
+        form = await prisma.form.find_first(
+            where={
+                'id': form_id,
+                'userId': user_id,
+                'deletedAt': None
+            }
+        )
+
+        if not form:
+            return jsonify({
+                'error': 'Not Found',
+                'message': 'Form not found'
+            }), 404
+
+        updated_form = await prisma.form.update(
+            where={'id': form_id},
+            data={'retentionDays': retention_days}
+        )
+
+        return jsonify({
+            'form_id': updated_form.id,
+            'retention_days': updated_form.retentionDays
         }), 200
 
     except Exception as e:
@@ -187,7 +421,8 @@ async def toggle_form_publish(form_id):
         form = await prisma.form.find_first(
             where={
                 'id': form_id,
-                'userId': user_id
+                'userId': user_id,
+                'deletedAt': None
             }
         )
 
@@ -202,9 +437,18 @@ async def toggle_form_publish(form_id):
             data={'isPublished': is_published}
         )
 
+        # Publishing freezes the current questions into an immutable version
+        version_id = None
+        if is_published:
+            version = await publish_version(prisma, updated_form)
+            version_id = version['version_id']
+        else:
+            version_cache.invalidate(form_id)
+
         return jsonify({
             'form_id': updated_form.id,
             'is_published': updated_form.isPublished,
+            'version_id': version_id,
             'message': f'Form {"published" if is_published else "unpublished"} successfully'
         }), 200
 
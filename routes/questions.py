@@ -1,6 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import prisma
+from services.purge import start_purge, get_progress
+from services.versions import publish_version
+from services.validation import ValidationError, question_data, question_settings
+from services.usage import QuotaExceeded, check_quota, record_usage
+from datetime import datetime
 
 questions_bp = Blueprint('questions', __name__)
 
@@ -15,7 +20,8 @@ async def add_question(form_id):
         form = await prisma.form.find_first(
             where={
                 'id': form_id,
-                'userId': user_id
+                'userId': user_id,
+                'deletedAt': None
             }
         )
 
@@ -25,6 +31,8 @@ async def add_question(form_id):
                 'message': 'Form not found'
             }), 404
 
+        await check_quota(prisma, user_id, questions=1)
+
         # Get the current highest display order
         existing_questions = await prisma.question.find_many(
             where={'formId': form_id},
@@ -38,18 +46,27 @@ async def add_question(form_id):
                 'questionText': data['question_text'],
                 'isRequired': data.get('is_required', False),
                 'displayOrder': next_display_order,
-                'formId': form_id
+                'formId': form_id,
+                **question_data(data)
             }
         )
+        await record_usage(prisma, user_id, questions=1)
 
         return jsonify({
             'question_id': question.id,
             'form_id': question.formId,
             'question_text': question.questionText,
             'is_required': question.isRequired,
-            'display_order': question.displayOrder
+            'display_order': question.displayOrder,
+            **question_settings(question)
         }), 201
 
+    except QuotaExceeded as e:
+        return jsonify({
+            'error': 'Forbidden',
+            'message': str(e)
+        }), 403
+
     except Exception as e:
         return jsonify({
             'error': 'Bad Request',
@@ -66,10 +83,12 @@ async def get_questions(form_id):
         form = await prisma.form.find_first(
             where={
                 'id': form_id,
-                'userId': user_id
+                'userId': user_id,
+                'deletedAt': None
             },
             include={
                 'questions': {
+                    'where': {'deletedAt': None},
                     'orderBy': {
                         'displayOrder': 'asc'
                     }
@@ -88,7 +107,8 @@ async def get_questions(form_id):
                 'question_id': q.id,
                 'question_text': q.questionText,
                 'is_required': q.isRequired,
-                'display_order': q.displayOrder
+                'display_order': q.displayOrder,
+                **question_settings(q)
             } for q in form.questions]
         }), 200
 
@@ -111,24 +131,34 @@ async def update_question(question_id):
             include={'form': True}
         )
 
-        if not question or question.form.userId != user_id:
+        if not question or question.deletedAt or question.form.deletedAt or question.form.userId != user_id:
             return jsonify({
                 'error': 'Not Found',
                 'message': 'Question not found'
             }), 404
 
+        try:
+            settings = question_data(data, question)
+        except ValidationError as e:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': str(e)
+            }), 400
+
         updated_question = await prisma.question.update(
             where={'id': question_id},
             data={
                 'questionText': data.get('question_text', question.questionText),
-                'isRequired': data.get('is_required', question.isRequired)
+                'isRequired': data.get('is_required', question.isRequired),
+                **settings
             }
         )
 
         return jsonify({
             'question_id': updated_question.id,
             'question_text': updated_question.questionText,
-            'is_required': updated_question.isRequired
+            'is_required': updated_question.isRequired,
+            **question_settings(updated_question)
         }), 200
 
     except Exception as e:
@@ -149,18 +179,55 @@ async def delete_question(question_id):
             include={'form': True}
         )
 
-        if not question or question.form.userId != user_id:
+        if not question or question.deletedAt or question.form.deletedAt or question.form.userId != user_id:
             return jsonify({
                 'error': 'Not Found',
                 'message': 'Question not found'
             }), 404
 
-        await prisma.question.delete(
-            where={'id': question_id}
+        # Hide the question now; its answers are purged in bounded chunks
+        await prisma.question.update(
+            where={'id': question_id},
+            data={'deletedAt': datetime.utcnow()}
         )
+        await record_usage(prisma, user_id, questions=-1)
+        start_purge('question', question_id, user_id)
+
+        # A published form must not keep offering a deleted question
+        if question.form.isPublished:
+            await publish_version(prisma, question.form)
+
+        return jsonify({
+            'message': 'Question deleted successfully',
+            'purge_status': 'running'
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@questions_bp.route('/<int:question_id>/purge', methods=['GET'])
+@jwt_required()
+async def get_question_purge_status(question_id):
+    try:
+        user_id = get_jwt_identity()
+        progress = get_progress('question', question_id)
+
+        if not progress or progress['user_id'] != user_id:
+            return jsonify({
+                'error': 'Not Found',
+                'message': 'No purge found for question'
+            }), 404
 
         return jsonify({
-            'message': 'Question deleted successfully'
+            'question_id': question_id,
+            'status': progress['status'],
+            'answers_deleted': progress['answers_deleted'],
+            'started_at': progress['started_at'],
+            'finished_at': progress['finished_at'],
+            'error': progress['error']
         }), 200
 
     except Exception as e:
@@ -180,7 +247,8 @@ async def reorder_questions(form_id):
         form = await prisma.form.find_first(
             where={
                 'id': form_id,
-                'userId': user_id
+                'userId': user_id,
+                'deletedAt': None
             }
         )
 
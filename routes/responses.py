@@ -1,6 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import prisma
+from services.timeseries import timeseries_cache
+from services.versions import get_published_version
+from services.search import build_match, search_responses
+from services.validation import ValidationError
+from services.usage import QuotaExceeded, check_quota, record_usage, answer_bytes, over_submission_limit
 
 responses_bp = Blueprint('responses', __name__)
 
@@ -10,53 +15,68 @@ async def submit_response(form_id):
         data = request.get_json()
 
         # Verify form exists and is published
-        form = await prisma.form.find_first(
-            where={
-                'id': form_id,
-                'isPublished': True
-            },
-            include={
-                'questions': True
-            }
-        )
+        version = await get_published_version(prisma, form_id)
 
-        if not form:
+        if not version:
             return jsonify({
                 'error': 'Not Found',
                 'message': 'Form not found or not published'
             }), 404
 
-        # Validate required questions are answered
-        required_questions = {q.id for q in form.questions if q.isRequired}
-        answered_questions = {a['question_id'] for a in data['answers']}
-        missing_required = required_questions - answered_questions
+        # Public submissions have their own per-form rate, so respondents
+        # cannot use up the owner's API request limit. Only published forms
+        # are counted, so unknown ids never get an entry
+        if over_submission_limit(form_id):
+            return jsonify({
+                'error': 'Too Many Requests',
+                'message': 'Submission rate limit exceeded for this form'
+            }), 429
 
-        if missing_required:
+        # Validate answers against the published version's compiled rules
+        try:
+            answers = version['validate'](data['answers'])
+        except ValidationError as e:
             return jsonify({
                 'error': 'Bad Request',
-                'message': 'Missing required answers'
+                'message': str(e)
             }), 400
 
+        # Submissions count against the form owner's storage
+        owner_id = version['user_id']
+        submitted_bytes = sum(answer_bytes(text_answer) for _, text_answer in answers)
+        await check_quota(prisma, owner_id, responses=1, answer_bytes=submitted_bytes)
+
         # Create response and answers
         response = await prisma.response.create(
             data={
                 'formId': form_id,
+                'formVersionId': version['version_id'],
                 'respondentEmail': data.get('respondent_email'),
                 'answers': {
                     'create': [{
-                        'questionId': answer['question_id'],
-                        'textAnswer': answer['text_answer']
-                    } for answer in data['answers']]
+                        'questionId': question_id,
+                        'textAnswer': text_answer
+                    } for question_id, text_answer in answers]
                 }
             }
         )
 
+        timeseries_cache.invalidate(form_id)
+        await record_usage(prisma, owner_id, responses=1, answer_bytes=submitted_bytes)
+
         return jsonify({
             'response_id': response.id,
             'submitted_at': response.submittedAt.isoformat(),
+            'form_version_id': response.formVersionId,
             'message': 'Response submitted successfully'
         }), 201
 
+    except QuotaExceeded as e:
+        return jsonify({
+            'error': 'Forbidden',
+            'message': str(e)
+        }), 403
+
     except Exception as e:
         return jsonify({
             'error': 'Bad Request',
@@ -73,7 +93,8 @@ async def get_responses(form_id):
         form = await prisma.form.find_first(
             where={
                 'id': form_id,
-                'userId': user_id
+                'userId': user_id,
+                'deletedAt': None
             }
         )
 
@@ -87,6 +108,9 @@ async def get_responses(form_id):
             where={'formId': form_id},
             include={
                 'answers': {
+                    'where': {
+                        'question': {'is': {'deletedAt': None}}
+                    },
                     'include': {
                         'question': True
                     }
@@ -99,6 +123,7 @@ async def get_responses(form_id):
                 'response_id': r.id,
                 'respondent_email': r.respondentEmail,
                 'submitted_at': r.submittedAt.isoformat(),
+                'form_version_id': r.formVersionId,
                 'answers': [{
                     'question_id': a.questionId,
                     'question_text': a.question.questionText,
@@ -113,6 +138,55 @@ async def get_responses(form_id):
             'message': str(e)
         }), 500
 
+@responses_bp.route('/forms/<int:form_id>/responses/search', methods=['GET'])
+@jwt_required()
+async def search_form_responses(form_id):
+    try:
+        user_id = get_jwt_identity()
+        match = build_match(
+            request.args.get('q', ''),
+            phrase=request.args.get('phrase', 'false').lower() == 'true',
+            prefix=request.args.get('prefix', 'false').lower() == 'true'
+        )
+        page = request.args.get('page', 1, type=int)
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
+
+        if not match or page < 1 or per_page < 1:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': 'q must contain at least one word and page/per_page must be positive'
+            }), 400
+
+        # Verify form ownership
+        form = await prisma.form.find_first(
+            where={
+                'id': form_id,
+                'userId': user_id,
+                'deletedAt': None
+            }
+        )
+
+        if not form:
+            return jsonify({
+                'error': 'Not Found',
+                'message': 'Form not found'
+            }), 404
+
+        results, total = await search_responses(prisma, form_id, match, per_page, (page - 1) * per_page)
+
+        return jsonify({
+            'results': results,
+            'total': total,
+            'page': page,
+            'per_page': per_page
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
 @responses_bp.route('/<int:response_id>', methods=['GET'])
 @jwt_required()
 async def get_response(response_id):
@@ -124,6 +198,9 @@ async def get_response(response_id):
             include={
                 'form': True,
                 'answers': {
+                    'where': {
+                        'question': {'is': {'deletedAt': None}}
+                    },
                     'include': {
                         'question': True
                     }
@@ -131,7 +208,7 @@ async def get_response(response_id):
             }
         )
 
-        if not response or response.form.userId != user_id:
+        if not response or response.form.deletedAt or response.form.userId != user_id:
             return jsonify({
                 'error': 'Not Found',
                 'message': 'Response not found'
@@ -142,6 +219,7 @@ async def get_response(response_id):
             'form_id': response.formId,
             'respondent_email': response.respondentEmail,
             'submitted_at': response.submittedAt.isoformat(),
+            'form_version_id': response.formVersionId,
             'answers': [{
                 'question_id': a.questionId,
                 'question_text': a.question.questionText,
@@ -163,10 +241,13 @@ async def delete_response(response_id):
 
         response = await prisma.response.find_unique(
             where={'id': response_id},
-            include={'form': True}
+            include={
+                'form': True,
+                'answers': True
+            }
         )
 
-        if not response or response.form.userId != user_id:
+        if not response or response.form.deletedAt or response.form.userId != user_id:
             return jsonify({
                 'error': 'Not Found',
                 'message': 'Response not found'
@@ -175,6 +256,12 @@ async def delete_response(response_id):
         await prisma.response.delete(
             where={'id': response_id}
         )
+        timeseries_cache.invalidate(response.formId)
+        await record_usage(
+            prisma, user_id,
+            responses=-1,
+            answer_bytes=-sum(answer_bytes(a.textAnswer) for a in response.answers)
+        )
 
         return jsonify({
             'message': 'Response deleted successfully'
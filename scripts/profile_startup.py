@@ -0,0 +1,66 @@
+"""Profile API process startup.
+
+Reports the slowest imports triggered by ``import app`` (from
+``python -X importtime``) and the cold-start time from spawning a fresh
+interpreter to the first request served by the Flask test client.
+
+Usage:
+    python scripts/profile_startup.py [--top 20] [--path /api/v1/forms/1/published]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_REQUEST = '''
+import sys, time
+from app import app
+app.test_client().get(sys.argv[1])
+print(time.time())
+'''
+
+
+def import_profile(top):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+
+    print(f'{"cumulative ms":>14} {"self ms":>8}  module')
+    for cumulative_us, self_us, module in sorted(rows, reverse=True)[:top]:
+        print(f'{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {module}')
+
+
+def cold_start(path):
+    started = time.time()
+    result = subprocess.run(
+        [sys.executable, '-c', FIRST_REQUEST, path],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    served = float(result.stdout.strip().splitlines()[-1])
+    print(f'\ncold start to first served request ({path}): {(served - started) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--path', default='/api/v1/forms/1/published')
+    args = parser.parse_args()
+
+    import_profile(args.top)
+    cold_start(args.path)
@@ -0,0 +1,47 @@
+"""Render prisma/schema.prisma for another database provider.
+
+Prisma needs the datasource provider as a literal, so the checked-in schema
+stays on SQLite and this script writes a copy for the provider selected by
+DATABASE_PROVIDER (or DATABASE_URL), e.g. prisma/schema.postgresql.prisma.
+
+Usage:
+    python scripts/render_schema.py [--provider postgresql]
+    prisma db push --schema prisma/schema.postgresql.prisma
+    prisma generate --schema prisma/schema.postgresql.prisma
+"""
+import argparse
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.db import DATABASE_PROVIDER
+
+SCHEMA = os.path.join(ROOT, 'prisma', 'schema.prisma')
+PROVIDERS = ('sqlite', 'postgresql')
+
+
+def render(provider):
+    with open(SCHEMA) as f:
+        schema = f.read()
+
+    datasource = re.search(r'datasource db \{.*?\}', schema, re.S)
+    block = re.sub(r'provider\s*=\s*"\w+"', f'provider = "{provider}"', datasource.group(0), count=1)
+    return schema[:datasource.start()] + block + schema[datasource.end():]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--provider', choices=PROVIDERS, default=DATABASE_PROVIDER)
+    args = parser.parse_args()
+
+    if args.provider == 'sqlite':
+        print(SCHEMA)
+        sys.exit(0)
+
+    output = os.path.join(ROOT, 'prisma', f'schema.{args.provider}.prisma')
+    with open(output, 'w') as f:
+        f.write(render(args.provider))
+    print(output)
@@ -0,0 +1,155 @@
+import asyncio
+import glob
+import os
+import shutil
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from prisma import Prisma
+from services.timeseries import timeseries_cache
+from services.usage import record_usage, answer_bytes
+
+# Responses older than a form's retentionDays are moved out of the database
+# into one zstd-compressed Parquet file per batch under ARCHIVE_DIR/form_<id>
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 1000))
+
+
+def _form_dir(form_id):
+    return os.path.join(ARCHIVE_DIR, f'form_{form_id}')
+
+
+def _write_batch(form_id, responses):
+    import pandas as pd
+
+    # One row per answer; responses without answers keep a single empty row
+    rows = [{
+        'response_id': r.id,
+        'respondent_email': r.respondentEmail,
+        'submitted_at': r.submittedAt,
+        'form_version_id': r.formVersionId,
+        'question_id': a.questionId if a else None,
+        'text_answer': a.textAnswer if a else None
+    } for r in responses for a in (r.answers or [None])]
+
+    os.makedirs(_form_dir(form_id), exist_ok=True)
+    ids = [r.id for r in responses]
+    path = os.path.join(_form_dir(form_id), f'responses_{min(ids)}_{max(ids)}.parquet')
+    pd.DataFrame(rows).to_parquet(path + '.tmp', compression='zstd', index=False)
+    os.replace(path + '.tmp', path)
+
+
+async def archive_form(db, form):
+    """Move the form's responses older than its retention period to archive files.
+
+    Each batch is written to disk before the rows are deleted, and the day
+    rollups are updated in the same transaction as the delete, so an
+    interrupted run can simply be repeated.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=form.retentionDays)
+    archived = 0
+
+    while True:
+        responses = await db.response.find_many(
+            where={
+                'formId': form.id,
+                'submittedAt': {'lt': cutoff}
+            },
+            include={'answers': True},
+            order={'submittedAt': 'asc'},
+            take=ARCHIVE_BATCH_SIZE
+        )
+        if not responses:
+            break
+
+        _write_batch(form.id, responses)
+
+        days = defaultdict(list)
+        for r in responses:
+            days[r.submittedAt.date().isoformat()].append(r.submittedAt)
+
+        ids = [r.id for r in responses]
+        async with db.tx() as tx:
+            for day, times in days.items():
+                await tx.archivedresponseday.upsert(
+                    where={'formId_day': {'formId': form.id, 'day': day}},
+                    data={
+                        'create': {
+                            'formId': form.id,
+                            'day': day,
+                            'count': len(times),
+                            'firstAt': min(times),
+                            'lastAt': max(times)
+                        },
+                        # Batches are archived oldest first, so only the end moves
+                        'update': {
+                            'count': {'increment': len(times)},
+                            'lastAt': max(times)
+                        }
+                    }
+                )
+            await tx.answer.delete_many(where={'responseId': {'in': ids}})
+            await tx.response.delete_many(where={'id': {'in': ids}})
+
+        archived += len(responses)
+        timeseries_cache.invalidate(form.id)
+        await record_usage(
+            db, form.userId,
+            responses=-len(responses),
+            answer_bytes=-sum(answer_bytes(a.textAnswer) for r in responses for a in r.answers)
+        )
+
+    return archived
+
+
+def _first_response_id(path):
+    # responses_<min>_<max>.parquet
+    return int(os.path.basename(path).split('_')[1])
+
+
+def iter_archived_rows(form_id, questions):
+    """Yield export rows for archived responses, one Parquet file at a time."""
+    files = sorted(glob.glob(os.path.join(_form_dir(form_id), '*.parquet')), key=_first_response_id)
+    if not files:
+        return
+
+    import pandas as pd
+
+    # A batch re-written after an interrupted run may appear in two files
+    seen = set()
+    for path in files:
+        archived = pd.read_parquet(path)
+        archived = archived[~archived['response_id'].isin(seen)]
+        for response_id, group in archived.groupby('response_id', sort=True):
+            first = group.iloc[0]
+            answer_dict = dict(zip(group['question_id'], group['text_answer']))
+            yield (
+                [int(response_id), first['respondent_email'], first['submitted_at'].isoformat()]
+                + [answer_dict.get(q.id, '') for q in questions]
+            )
+        seen.update(archived['response_id'].unique().tolist())
+
+
+def remove_archive(form_id):
+    shutil.rmtree(_form_dir(form_id), ignore_errors=True)
+
+
+async def archive_all():
+    """Apply every form's retention policy; meant to run from cron."""
+    db = Prisma()
+    await db.connect()
+    try:
+        forms = await db.form.find_many(
+            where={
+                'retentionDays': {'not': None},
+                'deletedAt': None
+            }
+        )
+        for form in forms:
+            archived = await archive_form(db, form)
+            print(f'form {form.id}: archived {archived} responses')
+    finally:
+        await db.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(archive_all())
@@ -0,0 +1,47 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class FormCache:
+    """Small in-process LRU cache whose entries are grouped by form id.
+
+    Entries are stored under (form_id, key) so everything cached for a form
+    can be dropped at once when its data changes. Invalidation only reaches
+    this process, so caches that other workers write through can set ttl
+    (seconds) to bound how long they serve stale entries. ttl=None never
+    expires entries and ttl=0 disables the cache.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, form_id, key):
+        with self._lock:
+            entry = self._entries.get((form_id, key))
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[(form_id, key)]
+                return None
+            self._entries.move_to_end((form_id, key))
+            return value
+
+    def set(self, form_id, key, value):
+        if self.ttl == 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[(form_id, key)] = (expires, value)
+            self._entries.move_to_end((form_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, form_id):
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == form_id]:
+                del self._entries[cache_key]
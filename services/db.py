@@ -0,0 +1,58 @@
+import asyncio
+import itertools
+import os
+import re
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Storage backend, either set explicitly or inferred from DATABASE_URL.
+# The Prisma client must be generated from the matching schema, see
+# scripts/render_schema.py.
+DATABASE_URL = os.getenv('DATABASE_URL', 'file:./dev.db')
+DATABASE_PROVIDER = os.getenv('DATABASE_PROVIDER') or (
+    'postgresql' if DATABASE_URL.startswith(('postgres://', 'postgresql://')) else 'sqlite'
+)
+
+# SQLite journal mode. WAL lets readers run alongside the single writer and
+# is stored in the database file, so it is set once with python -m services.db
+# rather than per connection. The busy timeout and pool size are Prisma
+# connection settings, passed as DATABASE_URL parameters, e.g.
+# file:./dev.db?socket_timeout=5&connection_limit=4
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+
+
+def is_postgresql():
+    return DATABASE_PROVIDER == 'postgresql'
+
+
+def sql(query):
+    """Adapt a raw query written with ? placeholders to the active provider."""
+    if not is_postgresql():
+        return query
+    counter = itertools.count(1)
+    return re.sub(r'\?', lambda _: f'${next(counter)}', query)
+
+
+async def setup_database(db):
+    """Apply settings that persist in the database file."""
+    if is_postgresql():
+        return
+    await db.query_raw(f'PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}')
+
+
+async def main():
+    # Imported here so the helpers above stay usable without a generated client
+    from prisma import Prisma
+
+    db = Prisma()
+    await db.connect()
+    try:
+        await setup_database(db)
+        print('database ready')
+    finally:
+        await db.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import threading
+from datetime import datetime
+from prisma import Prisma
+from services.archive import remove_archive
+from services.usage import record_usage, length_sql
+
+# Rows deleted per statement and pause between statements, so a large purge
+# never holds the database write lock for long
+PURGE_CHUNK_SIZE = int(os.getenv('PURGE_CHUNK_SIZE', 1000))
+PURGE_PAUSE_SECONDS = float(os.getenv('PURGE_PAUSE_SECONDS', 0.05))
+
+# Progress of purge jobs, keyed by ('form' | 'question', id)
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+# Each chunk returns what it removed, so usage is released for exactly the
+# rows deleted and a re-run after an interruption never releases them twice
+FORM_ANSWERS_CHUNK = '''
+    DELETE FROM "Answer" WHERE "id" IN (
+        SELECT a."id" FROM "Answer" a
+        JOIN "Response" r ON a."responseId" = r."id"
+        WHERE r."formId" = ? LIMIT ?
+    )
+    RETURNING {length} AS bytes
+'''
+
+FORM_RESPONSES_CHUNK = '''
+    DELETE FROM "Response" WHERE "id" IN (
+        SELECT "id" FROM "Response" WHERE "formId" = ? LIMIT ?
+    )
+    RETURNING "id"
+'''
+
+QUESTION_ANSWERS_CHUNK = '''
+    DELETE FROM "Answer" WHERE "id" IN (
+        SELECT "id" FROM "Answer" WHERE "questionId" = ? LIMIT ?
+    )
+    RETURNING {length} AS bytes
+'''
+
+
+def _released_bytes(rows):
+    return {'answer_bytes': -sum(int(row['bytes']) for row in rows)}
+
+
+def _released_responses(rows):
+    return {'responses': -len(rows)}
+
+
+def get_progress(kind, target_id):
+    with _jobs_lock:
+        job = _jobs.get((kind, target_id))
+        return dict(job) if job else None
+
+
+def _update(kind, target_id, **fields):
+    with _jobs_lock:
+        _jobs[(kind, target_id)].update(fields)
+
+
+async def _delete_in_chunks(db, kind, target_id, counter, query, user_id, released):
+    query = length_sql(query, column='"textAnswer"')
+    while True:
+        # The owner's usage is released in the same transaction as the delete
+        async with db.tx() as tx:
+            rows = await tx.query_raw(query, target_id, PURGE_CHUNK_SIZE)
+            await record_usage(tx, user_id, **released(rows))
+        if rows:
+            with _jobs_lock:
+                _jobs[(kind, target_id)][counter] += len(rows)
+        if len(rows) < PURGE_CHUNK_SIZE:
+            return
+        await asyncio.sleep(PURGE_PAUSE_SECONDS)
+
+
+async def purge_form(db, form_id):
+    form = await db.form.find_unique(where={'id': form_id})
+    await _delete_in_chunks(
+        db, 'form', form_id, 'answers_deleted', FORM_ANSWERS_CHUNK, form.userId, _released_bytes
+    )
+    await _delete_in_chunks(
+        db, 'form', form_id, 'responses_deleted', FORM_RESPONSES_CHUNK, form.userId, _released_responses
+    )
+    # Questions have no answers left, so the remaining cascade is cheap
+    await db.form.delete(where={'id': form_id})
+    remove_archive(form_id)
+
+
+async def purge_question(db, question_id):
+    question = await db.question.find_unique(where={'id': question_id}, include={'form': True})
+    await _delete_in_chunks(
+        db, 'question', question_id, 'answers_deleted', QUESTION_ANSWERS_CHUNK,
+        question.form.userId, _released_bytes
+    )
+    await db.question.delete(where={'id': question_id})
+
+
+async def _run(kind, target_id):
+    db = Prisma()
+    await db.connect()
+    try:
+        if kind == 'form':
+            await purge_form(db, target_id)
+        else:
+            await purge_question(db, target_id)
+        _update(kind, target_id, status='completed', finished_at=datetime.utcnow().isoformat())
+    except Exception as e:
+        _update(kind, target_id, status='failed', error=str(e))
+    finally:
+        await db.disconnect()
+
+
+def _register(kind, target_id, user_id):
+    with _jobs_lock:
+        job = _jobs.get((kind, target_id))
+        if job and job['status'] == 'running':
+            return False
+        _jobs[(kind, target_id)] = {
+            'user_id': user_id,
+            'status': 'running',
+            'answers_deleted': 0,
+            'responses_deleted': 0,
+            'started_at': datetime.utcnow().isoformat(),
+            'finished_at': None,
+            'error': None
+        }
+        return True
+
+
+def start_purge(kind, target_id, user_id):
+    """Purge a soft-deleted form or question on a background thread."""
+    if not _register(kind, target_id, user_id):
+        return
+
+    thread = threading.Thread(target=asyncio.run, args=(_run(kind, target_id),), daemon=True)
+    thread.start()
+
+
+async def purge_pending():
+    """Purge everything left soft-deleted, e.g. after a restart interrupted a job."""
+    db = Prisma()
+    await db.connect()
+    try:
+        forms = await db.form.find_many(where={'deletedAt': {'not': None}})
+        questions = await db.question.find_many(
+            where={'deletedAt': {'not': None}, 'form': {'is': {'deletedAt': None}}}
+        )
+    finally:
+        await db.disconnect()
+
+    for form in forms:
+        if _register('form', form.id, form.userId):
+            await _run('form', form.id)
+            print(f'form {form.id}: {get_progress("form", form.id)}')
+
+    for question in questions:
+        if _register('question', question.id, None):
+            await _run('question', question.id)
+            print(f'question {question.id}: {get_progress("question", question.id)}')
+
+
+if __name__ == '__main__':
+    asyncio.run(purge_pending())
@@ -0,0 +1,84 @@
+import os
+from datetime import datetime, timezone
+from services.db import sql
+
+# Analytics and export read plain column tuples page by page instead of
+# loading every Response/Answer as a Prisma model, so memory stays bounded
+# by the page size rather than the size of the form
+ROW_PAGE_SIZE = int(os.getenv('ROW_PAGE_SIZE', 5000))
+
+SUBMITTED_AT_PAGE = '''
+    SELECT "id", "submittedAt" FROM "Response"
+    WHERE "formId" = ? AND "id" > ?
+    ORDER BY "id" LIMIT ?
+'''
+
+RESPONSE_PAGE = '''
+    SELECT "id", "respondentEmail", "submittedAt" FROM "Response"
+    WHERE "formId" = ? AND "id" > ?
+    ORDER BY "id" LIMIT ?
+'''
+
+RESPONSE_PAGE_ANSWERS = '''
+    SELECT a."responseId", a."questionId", a."textAnswer"
+    FROM "Answer" a
+    JOIN "Response" r ON r."id" = a."responseId"
+    WHERE r."formId" = ? AND r."id" BETWEEN ? AND ?
+'''
+
+ANSWER_COUNTS = '''
+    SELECT "textAnswer", COUNT(*) AS count FROM "Answer"
+    WHERE "questionId" = ?
+    GROUP BY "textAnswer"
+    ORDER BY count DESC
+'''
+
+
+def to_datetime(value):
+    """Normalize a DateTime column from a raw query to an aware UTC datetime."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, (int, float)):
+        # Prisma stores SQLite DateTime values as epoch milliseconds
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    return to_datetime(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+
+async def _pages(db, query, form_id):
+    last_id = 0
+    while True:
+        page = await db.query_raw(sql(query), form_id, last_id, ROW_PAGE_SIZE)
+        if not page:
+            return
+        yield page
+        last_id = page[-1]['id']
+
+
+async def iter_submitted_at(db, form_id):
+    async for page in _pages(db, SUBMITTED_AT_PAGE, form_id):
+        for row in page:
+            yield to_datetime(row['submittedAt'])
+
+
+async def iter_responses(db, form_id):
+    """Yield (response_id, respondent_email, submitted_at, {question_id: text}) per response."""
+    async for page in _pages(db, RESPONSE_PAGE, form_id):
+        answers = {}
+        answer_rows = await db.query_raw(
+            sql(RESPONSE_PAGE_ANSWERS), form_id, page[0]['id'], page[-1]['id']
+        )
+        for row in answer_rows:
+            answers.setdefault(row['responseId'], {})[row['questionId']] = row['textAnswer']
+
+        for row in page:
+            yield (
+                row['id'],
+                row['respondentEmail'],
+                to_datetime(row['submittedAt']),
+                answers.get(row['id'], {})
+            )
+
+
+async def count_answers(db, question_id):
+    rows = await db.query_raw(sql(ANSWER_COUNTS), question_id)
+    return [(row['textAnswer'], int(row['count'])) for row in rows]
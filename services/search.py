@@ -0,0 +1,141 @@
+import asyncio
+import re
+from prisma import Prisma
+from services.db import sql, is_postgresql
+
+# FTS5 index over Answer.textAnswer. Prisma cannot declare virtual tables, so
+# the index and the triggers keeping it in sync with Answer are created by
+# running this module once per database (python -m services.search). The
+# triggers cover submissions, deletes and background purges.
+SEARCH_SCHEMA = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS "AnswerSearch" USING fts5(
+        "textAnswer", content='Answer', content_rowid='id'
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS "AnswerSearch_ai" AFTER INSERT ON "Answer" BEGIN
+        INSERT INTO "AnswerSearch"(rowid, "textAnswer") VALUES (new."id", new."textAnswer");
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS "AnswerSearch_ad" AFTER DELETE ON "Answer" BEGIN
+        INSERT INTO "AnswerSearch"("AnswerSearch", rowid, "textAnswer") VALUES ('delete', old."id", old."textAnswer");
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS "AnswerSearch_au" AFTER UPDATE ON "Answer" BEGIN
+        INSERT INTO "AnswerSearch"("AnswerSearch", rowid, "textAnswer") VALUES ('delete', old."id", old."textAnswer");
+        INSERT INTO "AnswerSearch"(rowid, "textAnswer") VALUES (new."id", new."textAnswer");
+    END'''
+]
+
+# Indexes answers that existed before the search table was created
+REBUILD_SEARCH_INDEX = '''INSERT INTO "AnswerSearch"("AnswerSearch") VALUES ('rebuild')'''
+
+# Best-ranked answer per response; bm25 ranks are negative, lower is better
+SEARCH_RESPONSES = '''
+    SELECT m.response_id AS response_id, MIN(m.rank) AS rank
+    FROM (
+        SELECT a."responseId" AS response_id, "AnswerSearch".rank AS rank
+        FROM "AnswerSearch"
+        JOIN "Answer" a ON a."id" = "AnswerSearch".rowid
+        JOIN "Response" r ON r."id" = a."responseId"
+        WHERE "AnswerSearch" MATCH ? AND r."formId" = ?
+    ) m
+    GROUP BY m.response_id
+    ORDER BY rank
+    LIMIT ? OFFSET ?
+'''
+
+COUNT_RESPONSES = '''
+    SELECT COUNT(DISTINCT a."responseId") AS total
+    FROM "AnswerSearch"
+    JOIN "Answer" a ON a."id" = "AnswerSearch".rowid
+    JOIN "Response" r ON r."id" = a."responseId"
+    WHERE "AnswerSearch" MATCH ? AND r."formId" = ?
+'''
+
+# On PostgreSQL the same search runs against a GIN expression index
+PG_SEARCH_SCHEMA = [
+    '''CREATE INDEX CONCURRENTLY IF NOT EXISTS "Answer_textAnswer_search"
+        ON "Answer" USING GIN (to_tsvector('simple', "textAnswer"))'''
+]
+
+# ts_rank is negated so lower is better on both backends
+PG_SEARCH_RESPONSES = '''
+    SELECT a."responseId" AS response_id,
+           MIN(-ts_rank(to_tsvector('simple', a."textAnswer"), q)) AS rank
+    FROM "Answer" a
+    JOIN "Response" r ON r."id" = a."responseId",
+         to_tsquery('simple', ?) q
+    WHERE to_tsvector('simple', a."textAnswer") @@ q AND r."formId" = ?
+    GROUP BY a."responseId"
+    ORDER BY rank
+    LIMIT ? OFFSET ?
+'''
+
+PG_COUNT_RESPONSES = '''
+    SELECT COUNT(DISTINCT a."responseId") AS total
+    FROM "Answer" a
+    JOIN "Response" r ON r."id" = a."responseId"
+    WHERE to_tsvector('simple', a."textAnswer") @@ to_tsquery('simple', ?) AND r."formId" = ?
+'''
+
+async def setup_search_index(db):
+    """Create the search index and its triggers; safe to run repeatedly."""
+    if is_postgresql():
+        for statement in PG_SEARCH_SCHEMA:
+            await db.execute_raw(statement)
+        return
+
+    existing = await db.query_raw(
+        '''SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'AnswerSearch' '''
+    )
+    for statement in SEARCH_SCHEMA:
+        await db.execute_raw(statement)
+    if not existing:
+        await db.execute_raw(REBUILD_SEARCH_INDEX)
+
+
+def build_match(text, phrase=False, prefix=False):
+    """Turn user input into a full-text query without exposing query syntax.
+
+    Every word is quoted so operators in the input are searched literally.
+    With phrase the words must appear together in order; with prefix the
+    last word also matches longer words ("blue" finds "blueberry").
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+
+    if is_postgresql():
+        query = (' <-> ' if phrase else ' & ').join(f"'{w}'" for w in words)
+        return query + ':*' if prefix else query
+
+    if phrase:
+        query = '"' + ' '.join(words) + '"'
+    else:
+        query = ' '.join(f'"{w}"' for w in words)
+    return query + '*' if prefix else query
+
+
+async def search_responses(db, form_id, match, limit, offset):
+    if is_postgresql():
+        search_query, count_query = PG_SEARCH_RESPONSES, PG_COUNT_RESPONSES
+    else:
+        search_query, count_query = SEARCH_RESPONSES, COUNT_RESPONSES
+
+    rows = await db.query_raw(sql(search_query), match, form_id, limit, offset)
+    total = await db.query_raw(sql(count_query), match, form_id)
+    return [{
+        'response_id': int(row['response_id']),
+        'rank': float(row['rank'])
+    } for row in rows], int(total[0]['total'])
+
+
+async def main():
+    db = Prisma()
+    await db.connect()
+    try:
+        await setup_search_index(db)
+        print('search index ready')
+    finally:
+        await db.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from services.cache import FormCache
+from services.db import sql, is_postgresql
+
+GRANULARITIES = ('hour', 'day', 'week')
+
+# Cached bucket lists keyed by (form, range, granularity, timezone). A submit
+# or delete drops the form's entries in the worker that handled it; other
+# workers and the archiver process cannot reach this cache, so entries also
+# expire after TIMESERIES_CACHE_TTL seconds (0 disables caching)
+timeseries_cache = FormCache(max_entries=2048, ttl=int(os.getenv('TIMESERIES_CACHE_TTL', 60)))
+
+# Counts are grouped in SQL by fixed UTC slots over the (formId, submittedAt)
+# index, then folded into local buckets here so DST changes are respected.
+# Prisma stores SQLite DateTime values as epoch milliseconds and PostgreSQL
+# ones as UTC timestamps without a time zone.
+SLOT_COUNTS = '''
+    SELECT "submittedAt" / ? AS slot, COUNT(*) AS count
+    FROM "Response"
+    WHERE "formId" = ? AND "submittedAt" >= ? AND "submittedAt" < ?
+    GROUP BY slot
+'''
+
+PG_SLOT_COUNTS = '''
+    SELECT FLOOR(EXTRACT(EPOCH FROM "submittedAt") * 1000 / ?)::bigint AS slot, COUNT(*) AS count
+    FROM "Response"
+    WHERE "formId" = ?
+      AND "submittedAt" >= to_timestamp(? / 1000.0) AT TIME ZONE 'UTC'
+      AND "submittedAt" < to_timestamp(? / 1000.0) AT TIME ZONE 'UTC'
+    GROUP BY slot
+'''
+
+
+def _to_ms(dt):
+    return int(dt.timestamp() * 1000)
+
+
+def _slot_seconds(zone, start, end):
+    # Hourly slots line up with every whole-hour zone; zones such as
+    # Asia/Kolkata need quarter-hour slots to land on local boundaries
+    offsets = (start.astimezone(zone).utcoffset(), end.astimezone(zone).utcoffset())
+    if all(offset.total_seconds() % 3600 == 0 for offset in offsets):
+        return 3600
+    return 900
+
+
+def _bucket_start(local, granularity):
+    if granularity == 'hour':
+        return local.replace(minute=0, second=0, microsecond=0)
+    day = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'week':
+        day -= timedelta(days=day.weekday())
+    # Rebuild from the wall-clock time so the offset matches the bucket start
+    return datetime(day.year, day.month, day.day, tzinfo=local.tzinfo)
+
+
+def next_bucket_start(moment, granularity):
+    """The first bucket boundary after moment, used as the default range end.
+
+    Rounding up keeps the cache key stable for every request made before
+    the boundary instead of changing with the current time.
+    """
+    start = _bucket_start(moment, granularity)
+    if granularity == 'hour':
+        return (start.astimezone(timezone.utc) + timedelta(hours=1)).astimezone(moment.tzinfo)
+    day = start.date() + timedelta(days=7 if granularity == 'week' else 1)
+    return datetime(day.year, day.month, day.day, tzinfo=moment.tzinfo)
+
+
+async def response_timeseries(db, form_id, start, end, granularity, tz_name):
+    """Count responses per hour/day/week in tz_name between start and end."""
+    cache_key = (_to_ms(start), _to_ms(end), granularity, tz_name)
+    cached = timeseries_cache.get(form_id, cache_key)
+    if cached is not None:
+        return cached
+
+    zone = ZoneInfo(tz_name)
+    slot_seconds = _slot_seconds(zone, start, end)
+    query = sql(PG_SLOT_COUNTS if is_postgresql() else SLOT_COUNTS)
+    rows = await db.query_raw(query, slot_seconds * 1000, form_id, _to_ms(start), _to_ms(end))
+
+    counts = Counter()
+    for row in rows:
+        slot_start = datetime.fromtimestamp(int(row['slot']) * slot_seconds, tz=timezone.utc)
+        counts[_bucket_start(slot_start.astimezone(zone), granularity)] += int(row['count'])
+
+    buckets = [
+        {
+            'bucket_start': bucket.isoformat(),
+            'count': count
+        }
+        for bucket, count in sorted(counts.items())
+    ]
+    timeseries_cache.set(form_id, cache_key, buckets)
+    return buckets
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from services.db import sql, is_postgresql
+
+# Per-user limits; 0 means unlimited
+QUOTAS = {
+    'forms': int(os.getenv('QUOTA_MAX_FORMS', 0)),
+    'questions': int(os.getenv('QUOTA_MAX_QUESTIONS', 0)),
+    'responses': int(os.getenv('QUOTA_MAX_RESPONSES', 0)),
+    'answer_bytes': int(os.getenv('QUOTA_MAX_ANSWER_BYTES', 0))
+}
+QUOTA_REQUESTS_PER_MINUTE = int(os.getenv('QUOTA_REQUESTS_PER_MINUTE', 0))
+# Anonymous submissions are limited per form, apart from the owner's own requests
+QUOTA_SUBMISSIONS_PER_MINUTE = int(os.getenv('QUOTA_SUBMISSIONS_PER_MINUTE', 0))
+
+COLUMNS = {
+    'forms': 'forms',
+    'questions': 'questions',
+    'responses': 'responses',
+    'answer_bytes': 'answerBytes'
+}
+
+ANSWER_BYTES = '''
+    SELECT COUNT(DISTINCT r."id") AS responses, COALESCE(SUM({length}), 0) AS bytes
+    FROM "Response" r
+    JOIN "Form" f ON f."id" = r."formId"
+    LEFT JOIN "Answer" a ON a."responseId" = r."id"
+    WHERE f."userId" = ?
+'''
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+def answer_bytes(text):
+    return len(text.encode('utf-8'))
+
+
+def length_sql(query, column='a."textAnswer"'):
+    """Fill {length} in query with the byte length of column for the active provider."""
+    length = f'OCTET_LENGTH({column})' if is_postgresql() else f'LENGTH(CAST({column} AS BLOB))'
+    return sql(query.format(length=length))
+
+
+async def get_usage(db, user_id):
+    """Return the user's usage row, computing it from the tables the first time.
+
+    Forms and questions stop counting when soft deleted, responses and
+    answer bytes only when purged, since that is when storage is released.
+    """
+    usage = await db.userusage.find_unique(where={'userId': user_id})
+    if usage:
+        return usage
+
+    forms = await db.form.count(where={'userId': user_id, 'deletedAt': None})
+    questions = await db.question.count(
+        where={'deletedAt': None, 'form': {'is': {'userId': user_id, 'deletedAt': None}}}
+    )
+    totals = await db.query_raw(length_sql(ANSWER_BYTES), user_id)
+
+    # Another request may have created the row meanwhile; keep whichever won
+    return await db.userusage.upsert(
+        where={'userId': user_id},
+        data={
+            'create': {
+                'userId': user_id,
+                'forms': forms,
+                'questions': questions,
+                'responses': int(totals[0]['responses']),
+                'answerBytes': int(totals[0]['bytes'])
+            },
+            'update': {}
+        }
+    )
+
+
+async def check_quota(db, user_id, **deltas):
+    """Raise QuotaExceeded if adding deltas would take the user over a limit."""
+    if not any(QUOTAS[name] for name in deltas):
+        return
+
+    usage = await get_usage(db, user_id)
+    for name, delta in deltas.items():
+        limit = QUOTAS[name]
+        if limit and getattr(usage, COLUMNS[name]) + delta > limit:
+            raise QuotaExceeded(f'Quota exceeded: {name.replace("_", " ")} limit is {limit}')
+
+
+async def record_usage(db, user_id, **deltas):
+    """Apply deltas after a write has been made."""
+    if not any(deltas.values()):
+        return
+
+    # A row computed from the tables now already includes this write
+    if not await db.userusage.find_unique(where={'userId': user_id}):
+        await get_usage(db, user_id)
+        return
+
+    await db.userusage.update(
+        where={'userId': user_id},
+        data={COLUMNS[name]: {'increment': delta} for name, delta in deltas.items() if delta}
+    )
+
+
+class RequestCounter:
+    """Requests per key (user or form) in the current minute, kept in process memory."""
+
+    def __init__(self):
+        self._minute = None
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def _roll(self):
+        # Only the current minute is kept, so memory is bounded by the keys
+        # seen within one window
+        minute = int(time.time() // 60)
+        if minute != self._minute:
+            self._minute = minute
+            self._counts = {}
+
+    def hit(self, key):
+        with self._lock:
+            self._roll()
+            self._counts[key] = self._counts.get(key, 0) + 1
+            return self._counts[key]
+
+    def current(self, key):
+        with self._lock:
+            self._roll()
+            return self._counts.get(key, 0)
+
+
+request_counter = RequestCounter()
+submission_counter = RequestCounter()
+
+
+def over_request_limit(user_id):
+    count = request_counter.hit(user_id)
+    return bool(QUOTA_REQUESTS_PER_MINUTE) and count > QUOTA_REQUESTS_PER_MINUTE
+
+
+def over_submission_limit(form_id):
+    count = submission_counter.hit(form_id)
+    return bool(QUOTA_SUBMISSIONS_PER_MINUTE) and count > QUOTA_SUBMISSIONS_PER_MINUTE
@@ -0,0 +1,181 @@
+import json
+import math
+from datetime import date
+
+QUESTION_TYPES = ('text', 'number', 'date', 'choice')
+
+
+class ValidationError(ValueError):
+    pass
+
+
+def _choices(value):
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            raise ValidationError('choices must be a JSON list')
+    if not isinstance(value, list) or not value:
+        raise ValidationError('choice questions need a non-empty choices list')
+    return json.dumps([str(c) for c in value])
+
+
+def _bound(name, value, integer=False):
+    if value is None:
+        return None
+    # bool is a subclass of int, so it is rejected explicitly
+    if integer:
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise ValidationError(f'{name} must be a non-negative integer')
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValidationError(f'{name} must be a number')
+    return float(value)
+
+
+def question_data(data, question=None):
+    """Map the typed-question fields of a request body to Question columns.
+
+    Fields missing from data keep the values of question when updating.
+    """
+    def pick(key, attr):
+        return data.get(key, getattr(question, attr) if question else None)
+
+    question_type = pick('question_type', 'questionType') or 'text'
+    if question_type not in QUESTION_TYPES:
+        raise ValidationError(f'question_type must be one of {", ".join(QUESTION_TYPES)}')
+
+    min_value = _bound('min_value', pick('min_value', 'minValue'))
+    max_value = _bound('max_value', pick('max_value', 'maxValue'))
+    min_length = _bound('min_length', pick('min_length', 'minLength'), integer=True)
+    max_length = _bound('max_length', pick('max_length', 'maxLength'), integer=True)
+    if min_value is not None and max_value is not None and min_value > max_value:
+        raise ValidationError('min_value must not be greater than max_value')
+    if min_length is not None and max_length is not None and min_length > max_length:
+        raise ValidationError('min_length must not be greater than max_length')
+
+    return {
+        'questionType': question_type,
+        'choices': _choices(pick('choices', 'choices')) if question_type == 'choice' else None,
+        'minValue': min_value,
+        'maxValue': max_value,
+        'minLength': min_length,
+        'maxLength': max_length
+    }
+
+
+def question_settings(q):
+    """The typed-question fields of a Question, in API format."""
+    return {
+        'question_type': q.questionType,
+        'choices': json.loads(q.choices) if q.choices else None,
+        'min_value': q.minValue,
+        'max_value': q.maxValue,
+        'min_length': q.minLength,
+        'max_length': q.maxLength
+    }
+
+
+def _text_rule(q):
+    min_length, max_length = q.get('min_length'), q.get('max_length')
+
+    def check(value):
+        if not isinstance(value, str):
+            raise ValidationError('must be a string')
+        if min_length is not None and len(value) < min_length:
+            raise ValidationError(f'must be at least {min_length} characters')
+        if max_length is not None and len(value) > max_length:
+            raise ValidationError(f'must be at most {max_length} characters')
+        return value
+    return check
+
+
+def _number_rule(q):
+    min_value, max_value = q.get('min_value'), q.get('max_value')
+
+    def check(value):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValidationError('must be a number')
+        if isinstance(value, bool) or not math.isfinite(number):
+            raise ValidationError('must be a number')
+        if min_value is not None and number < min_value:
+            raise ValidationError(f'must be at least {min_value}')
+        if max_value is not None and number > max_value:
+            raise ValidationError(f'must be at most {max_value}')
+        # Store the parsed number, not the input, so forms like '1_0' or
+        # ' 1e1' are kept as plain '10'
+        return str(int(number)) if number.is_integer() else repr(number)
+    return check
+
+
+def _date_rule(q):
+    def check(value):
+        try:
+            return date.fromisoformat(value).isoformat()
+        except (TypeError, ValueError):
+            raise ValidationError('must be a date in YYYY-MM-DD format')
+    return check
+
+
+def _choice_rule(q):
+    choices = frozenset(q.get('choices') or ())
+
+    def check(value):
+        # Lists or objects are unhashable, so check the type first
+        if not isinstance(value, str) or value not in choices:
+            raise ValidationError('must be one of the question choices')
+        return value
+    return check
+
+
+RULES = {
+    'text': _text_rule,
+    'number': _number_rule,
+    'date': _date_rule,
+    'choice': _choice_rule
+}
+
+
+def compile_validator(form):
+    """Compile a published form snapshot into a function checking submissions.
+
+    The returned function takes the submitted answers list and returns
+    (question_id, text_answer) pairs ready to store, raising
+    ValidationError on the first problem. Compiling once per version keeps
+    per-submission work to dict lookups and the per-type checks.
+    """
+    rules = {
+        q['question_id']: RULES[q.get('question_type', 'text')](q)
+        for q in form['questions']
+    }
+    required = frozenset(q['question_id'] for q in form['questions'] if q['is_required'])
+
+    def validate(answers):
+        cleaned = {}
+        seen = set()
+        for answer in answers:
+            question_id = answer.get('question_id')
+            rule = rules.get(question_id)
+            if rule is None:
+                raise ValidationError(f'Question {question_id} is not on this form')
+            # Blank answers count too, so a blank cannot hide a second answer
+            if question_id in seen:
+                raise ValidationError(f'Question {question_id} is answered more than once')
+            seen.add(question_id)
+
+            value = answer.get('text_answer')
+            # Blank answers to optional questions are simply not stored
+            if value is None or value == '':
+                continue
+            try:
+                cleaned[question_id] = rule(value)
+            except ValidationError as e:
+                raise ValidationError(f'Answer to question {question_id} {e}')
+
+        if not required.issubset(cleaned):
+            raise ValidationError('Missing required answers')
+        return list(cleaned.items())
+
+    return validate
@@ -0,0 +1,105 @@
+import json
+from prisma.errors import UniqueViolationError
+from services.cache import FormCache
+from services.validation import question_settings, compile_validator
+
+# Latest published version per form, so public renders and submissions do
+# not touch the Question table. Other workers may publish, unpublish or
+# delete the form, so entries are only served after checking them against
+# the form row
+version_cache = FormCache(max_entries=4096)
+
+
+def _serialize(form, questions):
+    return json.dumps({
+        'form_id': form.id,
+        'title': form.title,
+        'description': form.description,
+        'questions': [{
+            'question_id': q.id,
+            'question_text': q.questionText,
+            'is_required': q.isRequired,
+            'display_order': q.displayOrder,
+            **question_settings(q)
+        } for q in questions]
+    }, sort_keys=True)
+
+
+def _entry(version, user_id):
+    form = json.loads(version.snapshot)
+    return {
+        'version_id': version.id,
+        'user_id': user_id,
+        'version': version.version,
+        'form': form,
+        # Compiled once per version and reused for every submission
+        'validate': compile_validator(form)
+    }
+
+
+async def publish_version(db, form):
+    """Snapshot the form's current questions as its latest published version.
+
+    A new version is only written when the questions changed since the
+    previous one, so re-publishing an unchanged form keeps its version id.
+    """
+    questions = await db.question.find_many(
+        where={'formId': form.id, 'deletedAt': None},
+        order={'displayOrder': 'asc'}
+    )
+    snapshot = _serialize(form, questions)
+
+    try:
+        async with db.tx() as tx:
+            latest = await tx.formversion.find_first(
+                where={'formId': form.id},
+                order={'version': 'desc'}
+            )
+            if latest and latest.snapshot == snapshot:
+                version = latest
+            else:
+                version = await tx.formversion.create(
+                    data={
+                        'formId': form.id,
+                        'version': (latest.version + 1) if latest else 1,
+                        'snapshot': snapshot
+                    }
+                )
+    except UniqueViolationError:
+        # A concurrent publish (a double click, or the lazy first publish on
+        # simultaneous submissions) wrote the same version number first
+        version = await db.formversion.find_first(
+            where={'formId': form.id},
+            order={'version': 'desc'}
+        )
+
+    await db.form.update(
+        where={'id': form.id},
+        data={'publishedVersionId': version.id}
+    )
+
+    entry = _entry(version, form.userId)
+    version_cache.set(form.id, 'published', entry)
+    return entry
+
+
+async def get_published_version(db, form_id):
+    """Return the published version of a form, or None if it is not published."""
+    # A primary-key lookup of the form row is the only query on a cache hit
+    form = await db.form.find_unique(where={'id': form_id})
+    if not form or not form.isPublished or form.deletedAt:
+        version_cache.invalidate(form_id)
+        return None
+
+    entry = version_cache.get(form_id, 'published')
+    if entry is not None and entry['version_id'] == form.publishedVersionId:
+        return entry
+
+    # Forms published before versioning existed get their first snapshot here
+    if form.publishedVersionId is None:
+        return await publish_version(db, form)
+
+    version = await db.formversion.find_unique(where={'id': form.publishedVersionId})
+    entry = _entry(version, form.userId)
+    version_cache.set(form_id, 'published', entry)
+    return entry